@@ -0,0 +1,23 @@
+# cython: boundscheck=False, wraparound=False
+# Compiled genetic-operator kernels - same ballpark speedup as the numba kernels but with no JIT
+# warmup, which matters for short experiment runs. Build in place with:
+#   cythonize -i _kernels.pyx
+from cython.parallel import prange
+
+
+def crossover(float[:, :] parents, float[:, :] out, unsigned int[:] pairs, float[:, :] coin):
+    """Uniform crossover over the flattened genome matrix for a whole generation at once.
+
+    pairs is flat [mother0, father0, mother1, father1, ...]; child i takes each scalar from
+    parents[pairs[2i]] where coin[i, j] < 0.5 and from parents[pairs[2i+1]] otherwise. coin is
+    pre-drawn outside the kernel so the RNG stays a single bulk numpy call."""
+    cdef Py_ssize_t i, j
+    cdef unsigned int mother, father
+    for i in prange(out.shape[0], nogil=True):
+        mother = pairs[2 * i]
+        father = pairs[2 * i + 1]
+        for j in range(out.shape[1]):
+            if coin[i, j] < 0.5:
+                out[i, j] = parents[mother, j]
+            else:
+                out[i, j] = parents[father, j]
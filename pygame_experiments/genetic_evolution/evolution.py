@@ -1,11 +1,60 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from enum import Enum
+from math import floor
 
 import pygame
 import numpy
+from numba import njit, prange
 from simulation import Simulation
 
 from typing import List, Dict
 
+try:
+    # compiled crossover kernel (cythonize -i _kernels.pyx); optional, numpy fallback below
+    from _kernels import crossover as _crossover_kernel
+except ImportError:
+    _crossover_kernel = None
+
+# shared PCG64 generator - one bulk draw per generation beats many tiny legacy numpy.random calls
+_rng = numpy.random.default_rng()
+
+
+@dataclass
+class _EvaluationContext:
+    """Everything a worker process needs to score one organism - its own copy of the genome plus
+    the simulation config, so workers never touch shared state"""
+    genome: numpy.ndarray
+    config: dict
+
+
+def _evaluate_worker(context: _EvaluationContext):
+    """Runs one fitness evaluation - module-level so it pickles cleanly into a process pool"""
+    fitness_function = context.config["fitness_function"]
+    return fitness_function(context.genome, context.config)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _mutate_clamp(values, modes, noise):
+    """Fused mutate+clamp kernel over the population matrix (n_organisms, n_genes, dimension).
+
+    Noise is pre-drawn with numpy outside the kernel - numba's RNG is slower for bulk draws."""
+    for i in prange(values.shape[0]):
+        for j in range(values.shape[1]):
+            mode = modes[j]
+            for k in range(values.shape[2]):
+                v = values[i, j, k] + noise[i, j, k]
+                if mode == 0:  # CLIP
+                    v = 0.0 if v < 0.0 else (1.0 if v > 1.0 else v)
+                elif mode == 1:  # WRAP
+                    v = v - floor(v)
+                else:  # BOUNCE
+                    v = v - floor(v)
+                    if v > 0.5:
+                        v = 1.0 - v
+                values[i, j, k] = v
+
 
 # Genes: (determine behaviour by influencing state transitions) (these have no energy cost)
 #   Diet - how much energy an animal gets from eating plants vs other animals
@@ -93,13 +142,6 @@ class Gene:
         raise NotImplementedError
 
 
-class GeneHider(type):
-    """Metaclass that restricts access to genes which are part of a LinkedGene to that LinkedGene's methods"""
-
-    def __new__(cls, name, bases, attrs):
-        return super().__new__(cls, name, bases, attrs)
-
-
 class SingleGene(Gene):
     """All genes are normalized to a range of 0 to 1, and then scaled to the appropriate range for the gene, so that if
     a gene is missed during crossover, the resulting gene will still be valid"""
@@ -116,34 +158,92 @@ class SingleGene(Gene):
         self.max_value = max_value
         self.mode = mode
 
-        self.value = numpy.zeros(dimension)
+        self.value = numpy.zeros(dimension, dtype=numpy.float32)
 
-    def clamp(self):
-        if self.mode == SingleGene.Mode.CLIP:
-            self.value = numpy.clip(self.value, 0, 1)
-        elif self.mode == SingleGene.Mode.WRAP:
-            self.value = numpy.mod(self.value, 1)
-        elif self.mode == SingleGene.Mode.BOUNCE:
-            self.value = numpy.mod(self.value, 1)
-            self.value = numpy.where(self.value > 1 / 2, 1 - self.value, self.value)
+        # mode never changes after construction, so bind the matching clamp once here rather
+        # than re-branching on the enum every call
+        self.clamp = {SingleGene.Mode.CLIP: self._clamp_clip,
+                      SingleGene.Mode.WRAP: self._clamp_wrap,
+                      SingleGene.Mode.BOUNCE: self._clamp_bounce}[mode]
+
+    # the clamp variants work in place (out=) so that when value is a view into a shared Genome
+    # buffer it stays one - rebinding self.value to a fresh array would silently detach the gene
+    def _clamp_clip(self):
+        numpy.clip(self.value, 0, 1, out=self.value)
+
+    def _clamp_wrap(self):
+        numpy.mod(self.value, 1, out=self.value)
+
+    def _clamp_bounce(self):
+        numpy.mod(self.value, 1, out=self.value)
+        numpy.subtract(1, self.value, out=self.value, where=self.value > 1 / 2)
 
     def randomize(self):
-        self.value = numpy.random.uniform(0, 1, self.dimension)
+        self.value[:] = _rng.uniform(0, 1, self.dimension)
 
     def set_value(self, value):
         assert len(value) == self.dimension, f"Value must have {self.dimension} dimensions for gene {self.name}," \
                                              f" but has {len(value)} dimensions"
-        self.value = value
+        self.value[:] = value
         self.clamp()
 
-    def mutate(self, variance):
-        self.value += numpy.random.normal(0, variance, self.dimension)
+    def mutate(self, variance, noise=None):
+        """Noise can be a pre-scaled view into a generation-wide bulk draw to avoid a tiny
+        per-gene RNG call"""
+        if noise is None:
+            noise = _rng.standard_normal(self.dimension) * variance
+        self.value += noise
         self.clamp()
 
+    @staticmethod
+    def clamp_matrix(values, modes, xp=numpy):
+        """Clamps a whole population's gene matrix at once - modes indexes the gene axis"""
+        m_clip = modes == SingleGene.Mode.CLIP.value
+        m_wrap = modes == SingleGene.Mode.WRAP.value
+        m_bounce = modes == SingleGene.Mode.BOUNCE.value
+        values[:, m_clip] = xp.clip(values[:, m_clip], 0, 1)
+        values[:, m_wrap] = xp.mod(values[:, m_wrap], 1)
+        bounced = xp.mod(values[:, m_bounce], 1)
+        values[:, m_bounce] = xp.where(bounced > 1 / 2, 1 - bounced, bounced)
+
+    @staticmethod
+    def mutate_matrix(values, modes, variance, rng=_rng):
+        """Mutates a whole population's gene matrix with one draw and one clamp"""
+        values += rng.standard_normal(values.shape) * variance
+        SingleGene.clamp_matrix(values, modes)
+
+    @staticmethod
+    def randomize_matrix(values, rng=_rng):
+        values[:] = rng.uniform(0, 1, values.shape)
+
     def __repr__(self):
         return f"{self.name}: {self.value}"
 
 
+class Genome:
+    """Owns one contiguous buffer holding every gene value of an organism.
+
+    Instead of each SingleGene allocating its own tiny numpy array (each costing far more in
+    object headers than payload), the genes' values become views into a single array, so a whole
+    genome is contiguous in memory and flattens for free."""
+
+    def __init__(self, genes: List[SingleGene]):
+        self.genes = genes
+        self.data = numpy.zeros(sum(gene.dimension for gene in genes), dtype=numpy.float32)
+        offset = 0
+        for gene in genes:
+            view = self.data[offset:offset + gene.dimension]
+            view[:] = gene.value
+            gene.value = view
+            offset += gene.dimension
+
+    def flatten(self):
+        return self.data
+
+    def __repr__(self):
+        return f"Genome of {len(self.genes)} genes ({len(self.data)} scalars)"
+
+
 class LinkedGene(Gene):
     """A collection of genes that are inversely proportional to one another"""
     MINIMUM_WEIGHT = 0.001
@@ -152,33 +252,213 @@ class LinkedGene(Gene):
     def __init__(self, *genes: SingleGene):
         for gene in genes:
             assert gene.mode == SingleGene.Mode.CLIP, "Linked genes must have mode CLIP"
+            assert gene.dimension == 1, "Linked genes must be one-dimensional"
 
         self.strength = 1  # coefficient for the total strength of the linked genes
 
         self.genes = genes
-        self.weights = numpy.ones(len(genes))
+        self.weights = numpy.ones(len(genes), dtype=numpy.float32)
+        # precomputed once so update_genes is a single scale-and-offset instead of per-gene lookups
+        self._ranges = numpy.array([gene.max_value - gene.min_value for gene in genes], dtype=numpy.float32)
+        self._mins = numpy.array([gene.min_value for gene in genes], dtype=numpy.float32)
+        # contiguous output buffer; each linked gene's value becomes a view into it, so
+        # update_genes writes all genes with one in-place scale-and-offset and no per-gene scatter
+        self._out = numpy.empty(len(genes), dtype=numpy.float32)
+        for i, gene in enumerate(genes):
+            view = self._out[i:i + 1]
+            view[:] = gene.value
+            gene.value = view
         self.normalize()
 
+    # weight updates are in place (out=/augmented assignment) - rebinding self.weights would
+    # both allocate a fresh array per call and break any view aliasing over the weight vector
     def normalize(self):
         """Normalizes the weights so that they sum to 1 * self.strength"""
-        self.weights = numpy.clip(self.weights, LinkedGene.MINIMUM_WEIGHT, LinkedGene.MAXIMUM_WEIGHT)
-        self.weights = self.weights / numpy.sum(self.weights)
+        numpy.clip(self.weights, LinkedGene.MINIMUM_WEIGHT, LinkedGene.MAXIMUM_WEIGHT, out=self.weights)
+        self.weights /= numpy.sum(self.weights)
 
     def randomize(self):
-        self.weights = numpy.random.uniform(0, 1, len(self.genes))
+        self.weights[:] = _rng.uniform(0, 1, len(self.genes))
         self.normalize()
 
     def update_genes(self):
-        for i, gene in enumerate(self.genes):
-            gene.set_value(self.weights[i] * (gene.max_value - gene.min_value) + gene.min_value)
-
-    def mutate(self, variance):
-        for weight in self.weights:
-            weight += numpy.random.normal(0, variance)
+        numpy.multiply(self.weights, self._ranges, out=self._out)
+        self._out += self._mins
+
+    def mutate(self, variance, noise=None):
+        # a loop variable is a copy, so `for weight in self.weights: weight += ...` never
+        # touched the array - perturb the whole weight vector in one draw instead
+        if noise is None:
+            noise = _rng.standard_normal(len(self.weights)) * variance
+        self.weights += noise
         self.normalize()
         self.update_genes()
 
 
+class Population:
+    """Structure-of-arrays storage for the genomes of an entire population.
+
+    Rather than each organism owning a tiny numpy array per gene, every gene value lives in one
+    matrix of shape (n_organisms, n_genes, max_dimension), with min_value/max_value/mode held as
+    parallel per-gene arrays. Mutating and clamping the whole population is then a single numpy
+    call per generation instead of one Python call per gene per organism.
+
+    xp picks the array backend the matrix lives on: numpy (default) or any module with the same
+    interface, e.g. cupy to keep the whole population resident on the GPU. The kernels are plain
+    array expressions, so they run wherever the matrix lives; fitness results come back to the
+    host as one transfer per generation."""
+
+    def __init__(self, n_organisms, gene_templates: List[SingleGene], seed=None, xp=numpy):
+        self.xp = xp
+        self.n_organisms = n_organisms
+        self._rng = numpy.random.default_rng(seed)
+        self.gene_templates = gene_templates
+        self.gene_names = [gene.name for gene in gene_templates]
+        self.max_dimension = max(gene.dimension for gene in gene_templates)
+
+        self.values = xp.zeros((n_organisms, len(gene_templates), self.max_dimension), dtype=xp.float32)
+        self.min_values = xp.asarray([gene.min_value for gene in gene_templates], dtype=xp.float32)
+        self.max_values = xp.asarray([gene.max_value for gene in gene_templates], dtype=xp.float32)
+        self.modes = xp.asarray([gene.mode.value for gene in gene_templates])
+        # scale factors and output buffer for phenotype(), computed/allocated once
+        self._range = self.max_values - self.min_values
+        self._phenotype = xp.empty_like(self.values)
+
+    def randomize(self):
+        if self.xp is numpy:
+            SingleGene.randomize_matrix(self.values, self._rng)
+        else:
+            self.values[:] = self.xp.random.uniform(0, 1, self.values.shape).astype(self.xp.float32)
+
+    def clamp(self):
+        SingleGene.clamp_matrix(self.values, self.modes, self.xp)
+
+    def mutate(self, variance):
+        # one bulk fp32 standard_normal per generation; views of it could be sliced out per gene
+        if self.xp is numpy:
+            noise = self._rng.standard_normal(self.values.shape, dtype=numpy.float32) * numpy.float32(variance)
+            _mutate_clamp(self.values, self.modes, noise)
+        else:
+            # on non-numpy backends the array expressions are already device kernels
+            self.values += self.xp.random.standard_normal(self.values.shape).astype(self.xp.float32) * variance
+            self.clamp()
+
+    def get_genome(self, index):
+        """Returns one organism's genome as a (n_genes, max_dimension) view into the matrix"""
+        return self.values[index]
+
+    def phenotype(self):
+        """The whole population's gene values scaled from the canonical [0,1] range to each
+        gene's real range - one broadcast into a preallocated buffer, no per-gene attribute
+        arithmetic. The buffer is reused, so copy it to keep a generation's phenotype around"""
+        self.xp.multiply(self.values, self._range[:, None], out=self._phenotype)
+        self._phenotype += self.min_values[:, None]
+        return self._phenotype
+
+    def select_parents(self, fitness, method="roulette", tournament_size=3):
+        """Picks n_organisms parent rows from the fitness array with no Python loop.
+
+        roulette samples proportionally to fitness via cumsum + searchsorted; tournament takes
+        the fittest of tournament_size random entrants per slot via one argmax."""
+        if method == "roulette":
+            cumulative = numpy.cumsum(fitness / numpy.sum(fitness))
+            return numpy.searchsorted(cumulative, self._rng.random(self.n_organisms))
+        if method == "tournament":
+            entrants = self._rng.integers(0, self.n_organisms, (self.n_organisms, tournament_size))
+            return entrants[numpy.arange(self.n_organisms), numpy.argmax(fitness[entrants], axis=1)]
+        raise ValueError(f"Unknown selection method {method}")
+
+    def crossover(self, pairs):
+        """Breeds the whole next generation with one batched uniform crossover.
+
+        pairs is a flat array [mother0, father0, mother1, father1, ...] of parent rows, one pair
+        per child. Uses the compiled _kernels extension when built, otherwise a numpy where."""
+        flat = self.values.reshape(self.n_organisms, -1)
+        if self.xp is numpy and _crossover_kernel is not None:
+            coin = self._rng.random(flat.shape, dtype=numpy.float32)
+            out = numpy.empty_like(flat)
+            _crossover_kernel(flat.copy(), out, pairs.astype(numpy.uint32), coin)
+        else:
+            coin = self.xp.random.uniform(0, 1, flat.shape) if self.xp is not numpy \
+                else self._rng.random(flat.shape, dtype=numpy.float32)
+            out = self.xp.where(coin < 0.5, flat[pairs[0::2]], flat[pairs[1::2]])
+        self.values[:] = out.reshape(self.values.shape)
+
+    def evaluate(self, fitness_function, config=None, parallel=False, max_workers=None):
+        """Scores every organism and returns the fitness array.
+
+        Fitness evaluation is the dominant cost of a generation, so with parallel=True the
+        organisms are farmed out master-slave style to a process pool and scored concurrently.
+        Debug runs stay sequential by default."""
+        config = dict(config or {}, fitness_function=fitness_function)
+        # one device-to-host transfer per generation when the matrix lives on the GPU
+        values = self.values if self.xp is numpy else self.xp.asnumpy(self.values)
+        contexts = [_EvaluationContext(values[i].copy(), config) for i in range(self.n_organisms)]
+        if parallel:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                return numpy.array(list(pool.map(_evaluate_worker, contexts)))
+        return numpy.array([_evaluate_worker(context) for context in contexts])
+
+    def similarity_matrix(self):
+        """Returns the pairwise (n_organisms, n_organisms) similarity matrix in one broadcast,
+        rather than calling a per-organism similarity method O(N^2) times"""
+        flat = self.values.reshape(self.n_organisms, -1)
+        return 1 - self.xp.mean(self.xp.abs(flat[:, None, :] - flat[None, :, :]), axis=-1)
+
+    def __repr__(self):
+        return f"Population of {self.n_organisms} organisms, {len(self.gene_names)} genes each"
+
+
+class IslandModel:
+    """A set of independent subpopulations (islands) with periodic migration.
+
+    Each island evolves on its own SoA matrix with no shared state, so islands parallelize
+    trivially; instead of the whole population contending over selection every generation, only a
+    few organisms move to a neighbouring island every migration_interval generations."""
+
+    def __init__(self, n_islands, n_organisms, gene_templates: List[SingleGene],
+                 migration_rate=0.05, migration_interval=10, topology="ring"):
+        self.islands = [Population(n_organisms, gene_templates) for _ in range(n_islands)]
+        self.migration_rate = migration_rate
+        self.migration_interval = migration_interval
+        self.topology = topology
+        self.generation = 0
+
+    def randomize(self):
+        for island in self.islands:
+            island.randomize()
+
+    def step(self, variance, fitness_function=None, config=None):
+        """Advances every island one generation, migrating when the interval is up.
+
+        Mutation runs island-by-island: the numba kernel already spreads one island across all
+        cores, and its default threading layer is not safe to enter from several Python threads
+        at once. Fitness evaluation, the expensive part, is fanned out across islands."""
+        for island in self.islands:
+            island.mutate(variance)
+        self.generation += 1
+        if fitness_function is not None and self.generation % self.migration_interval == 0:
+            with ThreadPoolExecutor(max_workers=len(self.islands)) as pool:
+                fitnesses = list(pool.map(lambda island: island.evaluate(fitness_function, config),
+                                          self.islands))
+            self.migrate(fitnesses)
+
+    def migrate(self, fitnesses):
+        """Copies each island's fittest organisms over the weakest of its ring neighbour"""
+        if self.topology != "ring":
+            raise NotImplementedError(f"Unknown topology {self.topology}")
+        n_migrants = max(1, int(self.migration_rate * self.islands[0].n_organisms))
+        order = [numpy.argsort(fitness) for fitness in fitnesses]
+        migrants = [island.values[ranking[-n_migrants:]].copy()
+                    for island, ranking in zip(self.islands, order)]
+        for i in range(len(self.islands)):
+            neighbour = (i + 1) % len(self.islands)
+            self.islands[neighbour].values[order[neighbour][:n_migrants]] = migrants[i]
+
+    def __repr__(self):
+        return f"IslandModel of {len(self.islands)} islands: {self.islands[0]!r}"
+
+
 class Feature:
     def __init__(self):
         self.COST_PER_UNIT_PER_SECOND = 1  # the energy cost of each unit of this feature
@@ -204,31 +484,39 @@ class Organism:
         PREDICTABILITY = 6
         MEMORY = 7
 
-    def __init__(self, sim: "Simulation"):
+    def __init__(self, sim: "Simulation", population: "Population" = None, index: int = None):
         self.genes: List[Gene] = []
         self.flat_genes = []
         self.features: Dict[str, Feature] = {}
         self.energy = 0
         self.max_energy = 100
         self.sim = sim
+        self.population = population  # the shared SoA genome matrix this organism's genes live in
+        self.index = index  # this organism's row in the population matrix
 
     @classmethod
     def from_parents(cls, parent1: "Organism", parent2: "Organism"):
-        """Creates a new animal from two parents"""
+        """Creates a new animal from two parents.
+
+        Thin wrapper - the actual gene mixing happens once per generation for all pairs at once
+        in Population.crossover, not per couple here."""
         # average genes, mutate genes, create new animal
         pass
 
     def sense_environment(self, environment):
-        """Returns a list of all objects that this animal can sense"""
-        pass
+        """Returns a list of all objects that this animal can sense - reads the batched KD-tree
+        query the simulation runs once per tick rather than scanning the environment itself"""
+        return environment.stimuli[self.index]
 
     def similarity(self, other: "Organism"):
-        """Returns a value between 0 and 1 indicating how similar this animal is to another animal"""
-        pass
+        """Returns a value between 0 and 1 indicating how similar this animal is to another animal.
+        Computed population-wide in one broadcast - see Population.similarity_matrix"""
+        return self.population.similarity_matrix()[self.index, other.index]
 
     def get_genome(self):
         """Returns a numpy array of all genes in this animal"""
-        pass
+        if self.population is not None:
+            return self.population.get_genome(self.index)
 
 
 def main():
@@ -238,6 +526,30 @@ def main():
 
     clock = pygame.time.Clock()
 
+    population = Population(200, [SingleGene("x", 0, 800), SingleGene("y", 0, 600)])
+    population.randomize()
+
+    # the EA runs on its own thread, stepping as fast as it can instead of once per rendered
+    # frame. It publishes into a ping-pong pair of snapshot buffers and the renderer reads the
+    # most recently published one, so neither side ever waits for the other's full step. numpy
+    # and the numba kernel release the GIL for the bulk work, so the overlap is real.
+    snapshots = [population.values.copy(), population.values.copy()]
+    latest = [0]
+    swap_lock = threading.Lock()
+    evolving = threading.Event()
+    evolving.set()
+
+    def ea_loop():
+        while evolving.is_set():
+            population.mutate(0.005)
+            back_buffer = 1 - latest[0]
+            snapshots[back_buffer][:] = population.values
+            with swap_lock:
+                latest[0] = back_buffer
+
+    worker = threading.Thread(target=ea_loop, daemon=True)
+    worker.start()
+
     running = True
     while running:
         for event in pygame.event.get():
@@ -246,9 +558,16 @@ def main():
 
         screen.fill((0, 0, 0))
 
+        with swap_lock:
+            snapshot = snapshots[latest[0]]
+        for x, y in zip((snapshot[:, 0, 0] * 800).tolist(), (snapshot[:, 1, 0] * 600).tolist()):
+            pygame.draw.circle(screen, (255, 0, 0), (x, y), 3)
+
         pygame.display.flip()
         clock.tick(60)
 
+    evolving.clear()
+    worker.join()
     pygame.quit()
 
 
@@ -263,3 +582,20 @@ if __name__ == "__main__":
     gene2.mutate(0.05)
     print(gene1)
     print(gene2)
+
+    genome = Genome([SingleGene("a", 0, 1), SingleGene("b", 0, 1, mode=SingleGene.Mode.BOUNCE)])
+    for gene in genome.genes:
+        gene.randomize()
+        gene.mutate(0.5)
+        # every operation must keep gene values as views into the shared buffer
+        assert gene.value.base is genome.data
+    print(genome, genome.flatten())
+
+    population = Population(5, [SingleGene("gene1", 0, 10),
+                                SingleGene("gene2", 0, 10, mode=SingleGene.Mode.WRAP),
+                                SingleGene("gene3", 0, 10, mode=SingleGene.Mode.BOUNCE)])
+    population.randomize()
+    print(population)
+    print(population.values)
+    population.mutate(0.05)
+    print(population.values)
@@ -1,5 +1,8 @@
 import pygame
 import numpy
+from scipy.spatial import cKDTree
+
+from typing import Dict, List, Tuple
 
 
 class Simulation:
@@ -7,9 +10,42 @@ class Simulation:
         self.organisms = []
         self.food = []
         self.water = []
+        self.n_organisms = n_organisms
         # numpy array containing positions of all organisms, food and water, and their index in the respective list:
         # [x, y, type, index]
         self.positions = numpy.zeros((n_organisms + n_food + n_water, 4))
+        # per-organism lists of sensed object indices, refreshed by sense_all once per tick
+        self.stimuli = [[] for _ in range(n_organisms)]
+        # coarse spatial hash over all positions, rebuilt once per tick by rebuild_grid
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        self._cell_size = None
+
+    def rebuild_grid(self, cell_size):
+        """Buckets every object into a coarse grid, to be called once per tick. With cell_size at
+        least the largest perception radius, a sense query only needs the 9 surrounding cells
+        instead of a scan over the whole population"""
+        self._cell_size = cell_size
+        self._grid = {}
+        cells = (self.positions[:, :2] // cell_size).astype(int)
+        for index, cell in enumerate(map(tuple, cells)):
+            self._grid.setdefault(cell, []).append(index)
+
+    def get_nearby(self, x, y):
+        """Returns candidate object indices from the grid cell containing (x, y) and its 8
+        neighbours - O(occupants) per query rather than O(N)"""
+        cell_x, cell_y = int(x // self._cell_size), int(y // self._cell_size)
+        nearby = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nearby.extend(self._grid.get((cell_x + dx, cell_y + dy), ()))
+        return nearby
+
+    def sense_all(self, perception_radius):
+        """Senses for every organism at once: one cKDTree build over all positions plus a single
+        batched query_ball_point, instead of an O(N^2) per-organism Python scan"""
+        tree = cKDTree(self.positions[:, :2])
+        self.stimuli = tree.query_ball_point(self.positions[:self.n_organisms, :2], r=perception_radius)
+        return self.stimuli
 
     def draw(self, screen):
         for x, y, type, index in self.positions:
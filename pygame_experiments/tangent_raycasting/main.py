@@ -0,0 +1,262 @@
+import random
+import time
+
+import pygame
+import numpy
+
+from math import sin, cos, pi, atan2, asin, sqrt
+
+# circles are obstacles; the mouse is a light source
+# for each circle, the two tangent lines from the light define a shadow quad behind it
+# rays cast from the light stop at the first circle they hit
+
+WIDTH, HEIGHT = 800, 600
+SHADOW_LENGTH = 2000  # how far past the tangent points a shadow quad extends
+N_CIRCLES = 30
+N_RAYS = 120
+
+
+# Naive implementations
+
+def get_tangents(circle, point):
+    """Returns the two tangent points of a circle seen from an external point, each paired with
+    its extension SHADOW_LENGTH away from the point: [(tx, ty, ex, ey), (tx, ty, ex, ey)]"""
+    cx, cy, cr = circle
+    px, py = point
+    dx, dy = cx - px, cy - py
+    distance = sqrt(dx ** 2 + dy ** 2)
+    if distance <= cr:
+        return None  # point is inside the circle, no tangents
+
+    base = atan2(dy, dx)
+    spread = asin(cr / distance)
+    length = sqrt(distance ** 2 - cr ** 2)
+
+    tangents = []
+    for sign in (-1, 1):
+        angle = base + sign * spread
+        tangents.append((px + length * cos(angle), py + length * sin(angle),
+                         px + SHADOW_LENGTH * cos(angle), py + SHADOW_LENGTH * sin(angle)))
+    return tangents
+
+
+def circle_line_intersection(circle, ray):
+    """Returns the intersections of a ray (x0, y0, x1, y1) with a circle as a list of (x, y, t),
+    t being the parameter along the ray (t >= 0 only)"""
+    cx, cy, cr = circle
+    x0, y0, x1, y1 = ray
+    dx, dy = x1 - x0, y1 - y0
+
+    a = dx ** 2 + dy ** 2
+    b = 2 * (dx * (x0 - cx) + dy * (y0 - cy))
+    c = (x0 - cx) ** 2 + (y0 - cy) ** 2 - cr ** 2
+    det = b ** 2 - 4 * a * c
+    if det < 0 or a == 0:
+        return []
+
+    intersections = []
+    for sign in (-1, 1):
+        t = (-b + sign * sqrt(det)) / (2 * a)
+        if t >= 0:
+            intersections.append((x0 + t * dx, y0 + t * dy, t))
+    return intersections
+
+
+# Vectorized implementations - one call across all circles instead of a Python loop per circle
+
+def get_tangents_numpy(cx, cy, cr, point):
+    """Tangent points for every circle at once; returns (tangent_points, extended_points), both
+    of shape (n_circles, 2, 2), and a mask of circles the point is outside of"""
+    px, py = point
+    dx, dy = cx - px, cy - py
+    distance = numpy.sqrt(dx ** 2 + dy ** 2)
+    outside = distance > cr
+
+    base = numpy.arctan2(dy, dx)
+    spread = numpy.arcsin(numpy.where(outside, cr / numpy.maximum(distance, 1e-12), 0))
+    length = numpy.sqrt(numpy.maximum(distance ** 2 - cr ** 2, 0))
+
+    angles = base[:, numpy.newaxis] + numpy.array([-1, 1]) * spread[:, numpy.newaxis]
+    directions = numpy.stack((numpy.cos(angles), numpy.sin(angles)), axis=-1)
+    tangent_points = numpy.array([px, py]) + length[:, numpy.newaxis, numpy.newaxis] * directions
+    extended_points = numpy.array([px, py]) + SHADOW_LENGTH * directions
+    return tangent_points, extended_points, outside
+
+
+def circle_line_intersection_numpy(cx, cy, cr, ray):
+    """Intersections of one ray with every circle at once; returns (xs, ys, ts) flat arrays of
+    every forward (t >= 0) intersection"""
+    x0, y0, x1, y1 = ray
+    dx, dy = x1 - x0, y1 - y0
+
+    a = dx ** 2 + dy ** 2
+    b = 2 * (dx * (x0 - cx) + dy * (y0 - cy))
+    c = (x0 - cx) ** 2 + (y0 - cy) ** 2 - cr ** 2
+    det = b ** 2 - 4 * a * c
+
+    hit = det >= 0
+    root = numpy.sqrt(det[hit])
+    ts = numpy.concatenate(((-b[hit] - root), (-b[hit] + root))) / (2 * a)
+    ts = ts[ts >= 0]
+    return x0 + ts * dx, y0 + ts * dy, ts
+
+
+def get_first_intersection(cx, cy, cr, ray):
+    """Returns the forward intersection closest to the ray origin as (x, y, t, circle_index),
+    or None. Works straight on the SoA circle arrays - one vectorized solve and an argmin over
+    t (which orders by true distance along the ray), with no per-circle list building"""
+    x0, y0, x1, y1 = ray
+    dx, dy = x1 - x0, y1 - y0
+
+    a = dx ** 2 + dy ** 2
+    b = 2 * (dx * (x0 - cx) + dy * (y0 - cy))
+    c = (x0 - cx) ** 2 + (y0 - cy) ** 2 - cr ** 2
+    det = b ** 2 - 4 * a * c
+
+    hit = det >= 0
+    if a == 0 or not numpy.any(hit):
+        return None
+    root = numpy.sqrt(det[hit])
+    ts = numpy.concatenate((-b[hit] - root, -b[hit] + root)) / (2 * a)
+    indices = numpy.tile(numpy.nonzero(hit)[0], 2)
+
+    forward = ts >= 0
+    if not numpy.any(forward):
+        return None
+    ts, indices = ts[forward], indices[forward]
+    best = numpy.argmin(ts)
+    t = ts[best]
+    return x0 + t * dx, y0 + t * dy, t, int(indices[best])
+
+
+def poly_circle_intersects(poly_pts, cx, cy, cr):
+    """Analytic polygon-circle intersection, vectorized over circles: a circle touches the
+    polygon iff a vertex lies inside it, an edge passes within its radius, or its centre is
+    inside the polygon. Avoids building a Point(...).buffer(r) polygon approximation and running
+    shapely's general intersects for every circle every frame."""
+    edge_starts = poly_pts
+    edge_ends = numpy.roll(poly_pts, -1, axis=0)
+    centers = numpy.stack((cx, cy), axis=-1)
+
+    # any polygon vertex inside any circle
+    vertex_d2 = numpy.sum((poly_pts[numpy.newaxis] - centers[:, numpy.newaxis]) ** 2, axis=-1)
+    vertex_hit = numpy.any(vertex_d2 <= cr[:, numpy.newaxis] ** 2, axis=1)
+
+    # closest point of each edge to each centre, via the clamped projection onto the edge
+    edges = edge_ends - edge_starts
+    to_centers = centers[:, numpy.newaxis] - edge_starts[numpy.newaxis]
+    t = numpy.sum(to_centers * edges, axis=-1) / numpy.sum(edges ** 2, axis=-1)
+    closest = edge_starts + numpy.clip(t, 0, 1)[..., numpy.newaxis] * edges
+    edge_d2 = numpy.sum((closest - centers[:, numpy.newaxis]) ** 2, axis=-1)
+    edge_hit = numpy.any(edge_d2 <= cr[:, numpy.newaxis] ** 2, axis=1)
+
+    # centre inside the polygon, by ray-cast parity over the crossing edges
+    x1, y1 = edge_starts.T
+    x2, y2 = edge_ends.T
+    crosses = (y1 > cy[:, numpy.newaxis]) != (y2 > cy[:, numpy.newaxis])
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        x_crossing = x1 + (cy[:, numpy.newaxis] - y1) * (x2 - x1) / (y2 - y1)
+    inside = numpy.sum(crosses & (cx[:, numpy.newaxis] < x_crossing), axis=1) % 2 == 1
+
+    return vertex_hit | edge_hit | inside
+
+
+def make_circles(n):
+    return [(random.uniform(0, WIDTH), random.uniform(0, HEIGHT), random.uniform(10, 40))
+            for _ in range(n)]
+
+
+def shadow_quad(tangents):
+    """The shadow quad between the two tangent lines, as a plain tuple of 4 points - no reason
+    to round-trip through a GEOS polygon just to hand coordinates to pygame.draw.polygon"""
+    return ((tangents[0][0], tangents[0][1]), (tangents[1][0], tangents[1][1]),
+            (tangents[1][2], tangents[1][3]), (tangents[0][2], tangents[0][3]))
+
+
+def benchmark(function, *args, maxtime=2, **kwargs):
+    start = time.time()
+    count = 0
+    while time.time() - start < maxtime:
+        function(*args, **kwargs)
+        count += 1
+    duration = time.time() - start
+    print(f"{function.__name__}:\nCount:\t\tDuration (s):\t\tAverage (ms):\n"
+          f"{count}\t\t\t{round(duration, 4)}\t\t\t\t{round(duration / count * 1000, 4)}\n")
+
+
+def run_benchmarks():
+    circles = make_circles(N_CIRCLES)
+    cx, cy, cr = numpy.array(circles).T
+    ray = (WIDTH / 2, HEIGHT / 2, WIDTH / 2 + 1, HEIGHT / 2)
+    point = (WIDTH / 2, HEIGHT / 2)
+
+    def tangents_naive():
+        for circle in circles:
+            get_tangents(circle, point)
+
+    def intersections_naive():
+        for circle in circles:
+            circle_line_intersection(circle, ray)
+
+    benchmark(tangents_naive)
+    benchmark(lambda: get_tangents_numpy(cx, cy, cr, point))
+    benchmark(intersections_naive)
+    benchmark(lambda: circle_line_intersection_numpy(cx, cy, cr, ray))
+    benchmark(lambda: get_first_intersection(cx, cy, cr, ray))
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Tangent Raycasting")
+    clock = pygame.time.Clock()
+
+    circles = make_circles(N_CIRCLES)
+    circle_x, circle_y, circle_r = numpy.array(circles).T
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        screen.fill((0, 0, 0))
+        light = pygame.mouse.get_pos()
+
+        shadowed = numpy.zeros(len(circles), dtype=bool)
+        for i, circle in enumerate(circles):
+            tangents = get_tangents(circle, light)
+            if tangents is None:
+                continue
+            quad = shadow_quad(tangents)
+            quad_pts = numpy.array(quad)
+            pygame.draw.polygon(screen, (40, 40, 40), quad)
+            # one analytic test over every circle at once per shadow quad
+            hit = poly_circle_intersects(quad_pts, circle_x, circle_y, circle_r)
+            hit[i] = False  # a quad starts at its own circle's tangent points
+            shadowed |= hit
+
+        for circle, in_shadow in zip(circles, shadowed):
+            # a circle is lit unless it sits inside another circle's shadow quad
+            color = (90, 90, 90) if in_shadow else (200, 200, 60)
+            pygame.draw.circle(screen, color, (circle[0], circle[1]), circle[2])
+
+        for i in range(N_RAYS):
+            angle = 2 * pi * i / N_RAYS
+            ray = (light[0], light[1], light[0] + cos(angle), light[1] + sin(angle))
+            first = get_first_intersection(circle_x, circle_y, circle_r, ray)
+            if first is not None:
+                end = (first[0], first[1])
+            else:
+                end = (light[0] + SHADOW_LENGTH * cos(angle), light[1] + SHADOW_LENGTH * sin(angle))
+            pygame.draw.line(screen, (255, 255, 200), light, end)
+
+        pygame.display.flip()
+        clock.tick(60)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    run_benchmarks()
+    main()